@@ -3,21 +3,23 @@
 # AUTHOR: Ferdinand
 # DESCRIPTION: Lead System Architect & Developer
 # ------------------------------------------------------------------------------
-# This code handles the thermodynamic modeling, cycle efficiencies,
-# and the data visualization logic for the integrated power system.
+# Streamlit front end for the integrated power system: input sidebar,
+# dashboard charts and thermodynamic diagrams, report tables, PDF export and
+# the process schematic. The thermodynamic model itself lives in simulation.py.
 # ==============================================================================
 
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")  # headless server rendering; no GUI backend needed
+from matplotlib.figure import Figure
 from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
 import io
+import os
+import tempfile
+from pathlib import Path
+from simulation import run_simulation
 
 # ==========================================================
 # PAGE CONFIG
@@ -27,150 +29,12 @@ st.set_page_config(layout="wide", page_title="AD-HTC Nexus")
 # ==========================================================
 # CUSTOM DARK THEME (kept exactly as provided)
 # ==========================================================
-st.markdown("""
-<style>
-
-/* ==============================
-   GLOBAL BACKGROUND
-============================== */
-.stApp {
-    background: linear-gradient(180deg, #0b1220 0%, #0a0f1a 100%);
-    color: #e5e7eb;
-    font-family: 'Inter', sans-serif;
-}
-
-/* ==============================
-   SIDEBAR
-============================== */
-section[data-testid="stSidebar"] {
-    background-color: #0f172a;
-    border-right: 1px solid #1f2937;
-}
-
-section[data-testid="stSidebar"] h1,
-section[data-testid="stSidebar"] h2,
-section[data-testid="stSidebar"] h3 {
-    color: #f3f4f6;
-}
-
-/* ==============================
-   HEADINGS
-============================== */
-h1 {
-    font-size: 2.2rem;
-    font-weight: 700;
-}
-
-h2, h3 {
-    color: #f3f4f6;
-}
-
-/* ==============================
-   INPUT FIELDS
-============================== */
-.stNumberInput input {
-    background-color: #111827 !important;
-    color: #e5e7eb !important;
-    border: 1px solid #1f2937 !important;
-    border-radius: 1px !important;
-}
-
-/* Sliders */
-.stSlider > div > div {
-    color: #ef4444 !important;
-}
-
-/* ==============================
-   RADIO BUTTONS
-============================== */
-div[role="radiogroup"] {
-    background-color: #111827;
-    padding: 12px;
-    border-radius: 12px;
-    border: 1px solid #1f2937;
-}
-
-/* ==============================
-   GLOWING ANALYZE BUTTON
-============================== */
-.stButton>button {
-    background: linear-gradient(90deg, #7c3aed, #3b82f6);
-    color: white;
-    font-weight: 600;
-    border-radius: 14px;
-    height: 3.2em;
-    border: none;
-    box-shadow: 0 0 15px rgba(124,58,237,0.6),
-                0 0 40px rgba(59,130,246,0.4);
-    transition: all 0.3s ease-in-out;
-}
-
-.stButton>button:hover {
-    transform: scale(1.01);
-    box-shadow: 0 0 25px rgba(124,58,237,0.9),
-                0 0 60px rgba(59,130,246,0.7);
-}
-
-/* ==============================
-   TABS
-============================== */
-button[data-baseweb="tab"] {
-    color: #9ca3af;
-    font-weight: 500;
-}
-
-button[data-baseweb="tab"][aria-selected="true"] {
-    color: #ef4444 !important;
-    border-bottom: 2px solid #ef4444 !important;
-}
-
-/* ==============================
-   PDF DOWNLOAD BUTTON
-============================== */
-.stDownloadButton>button {
-    background: linear-gradient(90deg, #10b981, #059669) !important;
-    color: white !important;
-    font-weight: 600 !important;
-    border-radius: 14px !important;
-    height: 3.2em !important;
-    border: none !important;
-    box-shadow: 0 0 15px rgba(16,185,129,0.6) !important;
-    animation: glow 2s ease-in-out infinite !important;
-}
-
-.stDownloadButton>button:hover {
-    transform: scale(1.02) !important;
-    box-shadow: 0 0 25px rgba(16,185,129,0.9) !important;
-}
-
-@keyframes glow {
-    0% { box-shadow: 0 0 15px rgba(16,185,129,0.6); }
-    50% { box-shadow: 0 0 25px rgba(16,185,129,0.9); }
-    100% { box-shadow: 0 0 15px rgba(16,185,129,0.6); }
-}
-
-/* ==============================
-   HIDE INDEX COLUMN IN TABLES
-============================== */
-.dataframe thead tr th:first-child {
-    display: none !important;
-}
-
-.dataframe tbody tr th:first-child {
-    display: none !important;
-}
-
-.dataframe tbody tr td:first-child {
-    display: none !important;
-}
-
-/* Ensure tables still look good without index */
-.dataframe {
-    width: 100% !important;
-}
-
-</style>
-""", unsafe_allow_html=True)
+# Stylesheet lives in assets/theme.css; read once and cached across reruns.
+@st.cache_data(show_spinner=False)
+def _load_css():
+    return Path("assets/theme.css").read_text(encoding="utf-8")
+
+st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
 
 # ==========================================================
 # SIDEBAR INPUTS (10 total) - preserved layout and labels
@@ -196,193 +60,103 @@ T3 = st.sidebar.number_input("Turbine Inlet Temperature (K)", value=1450.0, min_
 analyze = st.sidebar.button("🚀 Analyze System")
 
 # ==========================================================
-# SIMULATION FUNCTION (computes all expected outputs)
+# VALUE FORMATTERS
 # ==========================================================
-def run_simulation(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3):
-    # ---------- 1-2 Mass splits (Inputs 1 & 2)
-    m_dry = m_biomass * (1 - MC)  # kg/s
-    m_moisture = m_biomass * MC  # kg/s
-
-    # ---------- 3-6 Energy inputs (Input 3 LHV)
-    # Convert LHV to kJ/kg
-    LHV_kJ = LHV * 1000.0  # kJ/kg
-    # Fuel energy input (Brayton) from dry biomass
-    Q_in_Brayton = m_dry * LHV_kJ  # kJ/s (kW)
-    # Rankine heat input from moisture (uses enthalpy difference below)
-    # Boiler enthalpy approximations (h3) will be computed later; placeholder for now
-    # Q_in_Rankine computed after h3,h2 are known
-
-    # ---------- Brayton cycle (Inputs 7,8,9,10)
-    gamma = 1.4
-    Cp = 1.005  # kJ/kg.K (approx for air)
-    R = 0.287  # kJ/kg.K
-    T1 = 298.15  # K ambient
-    P1 = 0.1013  # MPa ambient
-    P2 = P1 * rp
-
-    # Isentropic compressor outlet temperature
-    T2s = T1 * (rp) ** ((gamma - 1) / gamma)
-    # Actual compressor outlet temperature using compressor efficiency
-    T2 = T1 + (T2s - T1) / eta_comp
-    # Compressor work per kg of working fluid (kJ/kg)
-    W_comp_per_kg = Cp * (T2 - T1)
-
-    # Choose a working fluid mass flow (kg/s) linked to fuel via an assumed AFR
-    AFR = 20.0  # air-to-fuel mass ratio (assumption)
-    working_flow = max(1.0, AFR * m_dry)  # kg/s of working fluid
-
-    # Total compressor work (kJ/s)
-    W_comp = W_comp_per_kg * working_flow
-
-    # Heat added per kg working fluid (kJ/kg) and total Qin for Brayton (kJ/s)
-    Qin_per_kg = Cp * (T3 - T2)
-    Qin_total = Qin_per_kg * working_flow
-
-    # Turbine expansion (isentropic then actual)
-    T4s = T3 * (1 / rp) ** ((gamma - 1) / gamma)
-    T4 = T3 - eta_turbine * (T3 - T4s)
-    W_turbine_per_kg = Cp * (T3 - T4)
-    W_turbine_brayton = W_turbine_per_kg * working_flow
-
-    # Net Brayton work (kJ/s)
-    W_net_brayton = W_turbine_brayton - W_comp
-
-    # Brayton efficiency (use total Qin_total)
-    eta_brayton = W_net_brayton / Qin_total if Qin_total > 0 else 0.0
-
-    # ---------- Rankine cycle (Inputs 4,5,6)
-    # Pump work per kg (kJ/kg) - incompressible approximation
-    v_f = 0.00101  # m3/kg
-    W_pump_per_kg = v_f * (boiler_p - cond_p) * 1000.0  # kJ/kg (MPa->kPa)
-    # Saturated liquid enthalpy approx at condenser pressure
-    if cond_p <= 0.01:
-        h1 = 191.8
-    elif cond_p <= 0.02:
-        h1 = 251.4
-    else:
-        h1 = 300.0
-    h2 = h1 + W_pump_per_kg
-
-    # Boiler outlet enthalpy (approx from boiler temperature)
-    h3 = 2800.0 + 2.0 * (boiler_T - 500.0)  # kJ/kg (approx)
-    # Isentropic enthalpy drop (approx) and actual turbine work per kg
-    delta_h_isentropic = 1200.0 * (1.0 - 0.03 * (boiler_p - 8.0))
-    W_turbine_rankine_per_kg_isentropic = delta_h_isentropic
-    W_turbine_rankine_per_kg_actual = W_turbine_rankine_per_kg_isentropic * eta_turbine
-    h4 = h3 - W_turbine_rankine_per_kg_actual
-
-    # Ensure physical bounds
-    if h4 < h1:
-        h4 = h1 + 50.0
-
-    # Heat recovery from Brayton exhaust
-    HRSG_eff = 0.85  # Heat recovery steam generator efficiency
-    Q_exhaust = working_flow * Cp * (T4 - T1)  # Waste heat available in exhaust
-    Q_in_Rankine = HRSG_eff * Q_exhaust  # Heat transferred to Rankine cycle
-
-    # Steam mass flow determined by available heat
-    m_steam = Q_in_Rankine / (h3 - h2) if (h3 - h2) > 0 else 0.0
-
-    W_turbine_rankine = m_steam * (h3 - h4)  # kJ/s
-    W_pump = W_pump_per_kg * m_steam  # kJ/s
-    W_net_rankine = W_turbine_rankine - W_pump
-
-    # Rankine efficiency (based on heat input to Rankine)
-    eta_rankine = W_net_rankine / Q_in_Rankine if Q_in_Rankine > 0 else 0.0
-
-    # ---------- Combined cycle - CORRECTED!
-    # Only the fuel input is the original energy source
-    total_fuel_input = Q_in_Brayton  # Only fuel energy, NOT adding recovered heat
-    total_output_work = max(0.0, W_net_brayton) + max(0.0, W_net_rankine)
-
-    # CORRECT: Divide total work by ONLY the fuel input
-    eta_combined = total_output_work / total_fuel_input if total_fuel_input > 0 else 0.0
-
-    # ---------- Energy flow analysis (Sankey data)
-    Q_fuel = Q_in_Brayton  # kJ/s ~ kW
-    Q_steam = Q_in_Rankine
-    useful_work = total_output_work
-    losses = Q_fuel - useful_work  # Losses are fuel minus useful work
-
-    # ---------- Gas production (AD-HTC empirical approximations)
-    gas_A = 0.568 * (rp / 8.0) ** 0.7 * (T3 / 1200.0) ** 0.5  # kg/hr
-    gas_B = 1.716 * (rp / 8.0) ** 0.8 * (T3 / 1200.0) ** 0.6  # kg/hr
-    methane = 1.029 * (T3 / 1200.0) ** 0.9 * (eta_combined / 0.5) ** 0.3  # kg/hr
-    heating_energy = 928106.3 * (eta_combined / 0.6) * (gas_B / 1.5)  # kJ (approx)
-
-    # ---------- Derived power outputs (kW)
-    brayton_power = max(0.0, W_net_brayton)  # kJ/s -> kW
-    rankine_power = max(0.0, W_net_rankine)  # kJ/s -> kW
-    total_power = brayton_power + rankine_power
-
-    # ---------- Fuel consumption (kg/hr) using LHV_kJ
-    # Use Q_in_Brayton (kJ/s) divided by LHV_kJ (kJ/kg) to get kg/s
-    m_fuel_kg_s = Q_in_Brayton / LHV_kJ if LHV_kJ > 0 else 0.0
-    fuel_consumption_kg_hr = m_fuel_kg_s * 3600.0
-
-    # ---------- Package results (include all expected outputs)
-    results = {
-        # 1-2 Mass flows
-        "m_dry": m_dry,
-        "m_moisture": m_moisture,
-        # 3-6 Energy & heat transfers
-        "Q_in_Brayton": Q_in_Brayton,
-        "Q_in_Rankine": Q_in_Rankine,
-        "Q_fuel": Q_fuel,
-        "Q_steam": Q_steam,
-        # 7-10 Work terms
-        "W_comp": W_comp,
-        "W_turb_brayton": W_turbine_brayton,
-        "W_turb_rankine": W_turbine_rankine,
-        "W_pump": W_pump,
-        "W_net_rankine": W_net_rankine,  # Added this
-        # 11 Net work
-        "W_net_brayton": W_net_brayton,
-        # 12-14 Efficiencies
-        "eta_brayton": eta_brayton,
-        "eta_rankine": eta_rankine,
-        "eta_combined": eta_combined,
-        # 15-17 Power outputs
-        "brayton_power": brayton_power,
-        "rankine_power": rankine_power,
-        "total_power": total_power,
-        # 18 Fuel consumption
-        "fuel_consumption_kg_hr": fuel_consumption_kg_hr,
-        # 19 Energy flow summary
-        "useful_work": useful_work,
-        "losses": losses,
-        # 20-23 Gas production & HTC
-        "gas_A": gas_A,
-        "gas_B": gas_B,
-        "methane": methane,
-        "heating_energy": heating_energy,
-        # 24-25 State points and enthalpies for charts
-        "T1": T1, "T2": T2, "T3": T3, "T4": T4,
-        "P1": P1, "P2": P2,
-        "h1": h1, "h2": h2, "h3": h3, "h4": h4,
-        # Echo inputs for report
-        "inputs": {
-            "m_biomass": m_biomass, "MC": MC, "LHV_MJkg": LHV,
-            "boiler_p": boiler_p, "boiler_T": boiler_T, "cond_p": cond_p,
-            "rp": rp, "eta_comp": eta_comp, "eta_turbine": eta_turbine, "T3": T3
-        }
-    }
-
-    return results
+# Bound str.format methods, parsed once at import and reused for every metric,
+# table cell and PDF row instead of re-parsing a format spec on each rerun.
+_fmt0 = "{:.0f}".format
+_fmt1 = "{:.1f}".format
+_fmt2 = "{:.2f}".format
+_fmt3 = "{:.3f}".format
+_fmtpct = "{:.2%}".format
+_fmtkghr = "{:.3f} kg/hr".format
+_fmtkj = "{:,.0f} kJ".format
 
 # ==========================================================
 # PDF GENERATION FUNCTION (uses results)
 # ==========================================================
+# Paragraph and table styles never change; build them once per server process
+# and share them between report builds. ReportLab is imported lazily here and
+# in generate_pdf_report so dashboard-only sessions never load it.
+@st.cache_resource
+def _pdf_styles():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+
+    def table_style(align):
+        return TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.grey),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+            ('ALIGN', (0,0), (-1,-1), align),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.black)
+        ])
+
+    return {
+        "title": ParagraphStyle('Title', parent=styles['Heading1'], fontSize=18, textColor=colors.HexColor('#7c3aed'), alignment=1),
+        "subtitle": ParagraphStyle('Subtitle', parent=styles['Normal'], fontSize=9, textColor=colors.HexColor('#94a3b8'), alignment=1),
+        "heading": ParagraphStyle('Heading', parent=styles['Heading2'], fontSize=12, textColor=colors.HexColor('#ef4444')),
+        "footer": styles['Italic'],
+        "table_left": table_style('LEFT'),
+        "table_center": table_style('CENTER'),
+    }
+
+# Table rows of the PDF report as (label, formatter, field) triples; the inputs
+# table reads from results.inputs, the others from results itself.
+_PDF_INPUTS_SCHEMA = (
+    ("Biomass mass flow (kg/s)", str, "m_biomass"),
+    ("Moisture content (fraction)", str, "MC"),
+    ("LHV (MJ/kg)", str, "LHV_MJkg"),
+    ("Boiler pressure (MPa)", str, "boiler_p"),
+    ("Boiler temperature (°C)", str, "boiler_T"),
+    ("Condenser pressure (MPa)", str, "cond_p"),
+    ("Compressor ratio", str, "rp"),
+    ("Compressor efficiency", str, "eta_comp"),
+    ("Turbine efficiency", str, "eta_turbine"),
+    ("Turbine inlet temp (K)", str, "T3"),
+)
+_PDF_EFF_SCHEMA = (
+    ("Rankine", _fmtpct, "eta_rankine"),
+    ("Brayton", _fmtpct, "eta_brayton"),
+    ("Combined", _fmtpct, "eta_combined"),
+)
+_PDF_ENERGY_SCHEMA = (
+    ("Dry biomass mass flow (kg/s)", _fmt3, "m_dry"),
+    ("Moisture mass flow (kg/s)", _fmt3, "m_moisture"),
+    ("Fuel energy input (kW)", _fmt2, "Q_fuel"),
+    ("Steam energy input (kW)", _fmt2, "Q_steam"),
+    ("Brayton net work (kW)", _fmt2, "W_net_brayton"),
+    ("Rankine turbine work (kW)", _fmt2, "W_turb_rankine"),
+    ("Pump work (kW)", _fmt2, "W_pump"),
+    ("Total power (kW)", _fmt2, "total_power"),
+    ("Fuel consumption (kg/hr)", _fmt3, "fuel_consumption_kg_hr"),
+)
+_PDF_GAS_SCHEMA = (
+    ("Gas A (kg/hr)", _fmt3, "gas_A"),
+    ("Gas B (kg/hr)", _fmt3, "gas_B"),
+    ("Methane (kg/hr)", _fmt3, "methane"),
+    ("HTC Heating Load (kJ)", _fmt0, "heating_energy"),
+)
+
+def _schema_rows(header, schema, source):
+    return [header] + [[label, fmt(getattr(source, key))] for label, fmt, key in schema]
+
 def generate_pdf_report(results):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
 
-    styles = getSampleStyleSheet()
+    styles = _pdf_styles()
     story = []
 
-    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=18, textColor=colors.HexColor('#7c3aed'), alignment=1)
-    subtitle_style = ParagraphStyle('Subtitle', parent=styles['Normal'], fontSize=9, textColor=colors.HexColor('#94a3b8'), alignment=1)
-    heading_style = ParagraphStyle('Heading', parent=styles['Heading2'], fontSize=12, textColor=colors.HexColor('#ef4444'))
+    title_style = styles["title"]
+    subtitle_style = styles["subtitle"]
+    heading_style = styles["heading"]
 
     story.append(Paragraph("AD-HTC Nexus System Analysis Report", title_style))
     story.append(Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style))
@@ -390,106 +164,176 @@ def generate_pdf_report(results):
 
     # Inputs summary
     story.append(Paragraph("1. Inputs", heading_style))
-    inputs = results["inputs"]
-    data_inputs = [
-        ["Parameter", "Value"],
-        ["Biomass mass flow (kg/s)", f"{inputs['m_biomass']}"],
-        ["Moisture content (fraction)", f"{inputs['MC']}"],
-        ["LHV (MJ/kg)", f"{inputs['LHV_MJkg']}"],
-        ["Boiler pressure (MPa)", f"{inputs['boiler_p']}"],
-        ["Boiler temperature (°C)", f"{inputs['boiler_T']}"],
-        ["Condenser pressure (MPa)", f"{inputs['cond_p']}"],
-        ["Compressor ratio", f"{inputs['rp']}"],
-        ["Compressor efficiency", f"{inputs['eta_comp']}"],
-        ["Turbine efficiency", f"{inputs['eta_turbine']}"],
-        ["Turbine inlet temp (K)", f"{inputs['T3']}"]
-    ]
+    data_inputs = _schema_rows(["Parameter", "Value"], _PDF_INPUTS_SCHEMA, results.inputs)
     table_inputs = Table(data_inputs, colWidths=[3.5*inch, 2.0*inch])
-    table_inputs.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black)
-    ]))
+    table_inputs.setStyle(styles["table_left"])
     story.append(table_inputs)
     story.append(Spacer(1, 12))
 
     # Efficiencies
     story.append(Paragraph("2. Cycle Efficiencies", heading_style))
-    data_eff = [
-        ["Cycle", "Efficiency (%)"],
-        ["Rankine", f"{results['eta_rankine']*100:.2f}%"],
-        ["Brayton", f"{results['eta_brayton']*100:.2f}%"],
-        ["Combined", f"{results['eta_combined']*100:.2f}%"]
-    ]
+    data_eff = _schema_rows(["Cycle", "Efficiency (%)"], _PDF_EFF_SCHEMA, results)
     table_eff = Table(data_eff, colWidths=[3.5*inch, 2.0*inch])
-    table_eff.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black)
-    ]))
+    table_eff.setStyle(styles["table_center"])
     story.append(table_eff)
     story.append(Spacer(1, 12))
 
     # Energy summary
     story.append(Paragraph("3. Energy Summary", heading_style))
-    data_energy = [
-        ["Parameter", "Value"],
-        ["Dry biomass mass flow (kg/s)", f"{results['m_dry']:.3f}"],
-        ["Moisture mass flow (kg/s)", f"{results['m_moisture']:.3f}"],
-        ["Fuel energy input (kW)", f"{results['Q_fuel']:.2f}"],
-        ["Steam energy input (kW)", f"{results['Q_steam']:.2f}"],
-        ["Brayton net work (kW)", f"{results['W_net_brayton']:.2f}"],
-        ["Rankine turbine work (kW)", f"{results['W_turb_rankine']:.2f}"],
-        ["Pump work (kW)", f"{results['W_pump']:.2f}"],
-        ["Total power (kW)", f"{results['total_power']:.2f}"],
-        ["Fuel consumption (kg/hr)", f"{results['fuel_consumption_kg_hr']:.3f}"]
-    ]
+    data_energy = _schema_rows(["Parameter", "Value"], _PDF_ENERGY_SCHEMA, results)
     table_energy = Table(data_energy, colWidths=[3.5*inch, 2.0*inch])
-    table_energy.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black)
-    ]))
+    table_energy.setStyle(styles["table_center"])
     story.append(table_energy)
     story.append(Spacer(1, 12))
 
     # Gas production
     story.append(Paragraph("4. AD-HTC Gas Production", heading_style))
-    data_gas = [
-        ["Parameter", "Value"],
-        ["Gas A (kg/hr)", f"{results['gas_A']:.3f}"],
-        ["Gas B (kg/hr)", f"{results['gas_B']:.3f}"],
-        ["Methane (kg/hr)", f"{results['methane']:.3f}"],
-        ["HTC Heating Load (kJ)", f"{results['heating_energy']:.0f}"]
-    ]
+    data_gas = _schema_rows(["Parameter", "Value"], _PDF_GAS_SCHEMA, results)
     table_gas = Table(data_gas, colWidths=[3.5*inch, 2.0*inch])
-    table_gas.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black)
-    ]))
+    table_gas.setStyle(styles["table_center"])
     story.append(table_gas)
     story.append(Spacer(1, 20))
 
-    footer = Paragraph("AD-HTC Nexus - Integrated Anaerobic Digestion & Hydrothermal Carbonization Power Plant Analysis", styles['Italic'])
+    footer = Paragraph("AD-HTC Nexus - Integrated Anaerobic Digestion & Hydrothermal Carbonization Power Plant Analysis", styles["footer"])
     story.append(footer)
 
     doc.build(story)
     buffer.seek(0)
     return buffer
 
+# Serialized report for the download button. Built only when the user asks
+# for it and kept in that session's state, so every report carries its own
+# "Generated on" time.
+def generate_pdf_bytes(results):
+    return generate_pdf_report(results).getvalue()
+
+# ==========================================================
+# THERMODYNAMIC DIAGRAMS (cached PNG renders)
+# ==========================================================
+# Diagrams are drawn and rasterized once per set of state points and cached as
+# PNG bytes, so reruns with unchanged inputs skip both drawing and savefig, and
+# no mutable Figure is shared between sessions. Figures are created with
+# Figure() rather than plt.subplots, so pyplot's figure manager never holds on
+# to them.
+
+# Dark theme shared by both diagrams
+matplotlib.rcParams.update({
+    'figure.facecolor': '#0f172a',
+    'axes.facecolor': '#0f172a',
+    'axes.labelcolor': 'white',
+    'axes.labelsize': 11,
+    'xtick.color': 'white',
+    'ytick.color': 'white',
+    'xtick.labelsize': 10,
+    'ytick.labelsize': 10,
+    'grid.alpha': 0.15,
+    'grid.linestyle': '--',
+})
+
+# Approximate saturation dome for the h-s chart (input independent)
+_S_LIQ = np.linspace(0.5, 3.0, 30)
+_H_LIQ = 200.0 + 300.0 * _S_LIQ
+_S_VAP = np.linspace(5.5, 8.5, 30)
+_H_VAP = 2500.0 + 200.0 * (_S_VAP - 5.5)
+
+# Same savefig options st.pyplot uses by default
+def _fig_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    return buf.getvalue()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _rankine_hs_png(boiler_p, eta_turbine, h1, h2, h3, h4):
+    fig1 = Figure(figsize=(8, 6))
+    ax1 = fig1.subplots()
+
+    ax1.plot(_S_LIQ, _H_LIQ, '--', color='#4b5563', alpha=0.7, linewidth=1.5)
+    ax1.plot(_S_VAP, _H_VAP, '--', color='#4b5563', alpha=0.7, linewidth=1.5)
+
+    pressure_factor = boiler_p / 8.0
+    s1 = 0.8
+    s2 = 0.85
+    s3 = 6.5 + 0.5 * (pressure_factor - 1)
+    s4 = s3 + 0.8 * (1 - eta_turbine)
+
+    points_x = [s1, s2, s3, s4, s1]
+    points_y = [h1, h2, h3, h4, h1]
+
+    ax1.plot(points_x, points_y, 'o-', color='#ef4444', linewidth=2.5, markersize=8,
+             markerfacecolor='white', markeredgecolor='#ef4444')
+
+    ax1.text(s1 - 0.1, h1 - 30, '1', color='white', fontsize=12, fontweight='bold')
+    ax1.text(s2 + 0.1, h2 - 30, '2', color='white', fontsize=12, fontweight='bold')
+    ax1.text(s3 + 0.1, h3 + 30, '3', color='white', fontsize=12, fontweight='bold')
+    ax1.text(s4 + 0.1, h4 - 30, '4', color='white', fontsize=12, fontweight='bold')
+
+    ax1.set_xlim(0, 9)
+    ax1.set_ylim(0, 3500)
+    ax1.set_xlabel("Entropy (kJ/kg·K)")
+    ax1.set_ylabel("Enthalpy (kJ/kg)")
+    ax1.grid(True)
+    return _fig_png(fig1)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _brayton_ts_png(T1, T2, T3, T4, P1, P2):
+    fig2 = Figure(figsize=(8, 6))
+    ax2 = fig2.subplots()
+
+    Cp_diag = 1.005
+    R_diag = 0.287
+    eps = 1e-9
+
+    T1 = max(T1, eps)
+    T2 = max(T2, eps)
+    T3 = max(T3, eps)
+    T4 = max(T4, eps)
+
+    P1 = max(P1, eps)
+    P2 = max(P2, eps)
+
+    # Correct entropy relations
+    s1 = 0
+    s2 = Cp_diag * np.log(T2 / T1) - R_diag * np.log(P2 / P1)
+    s3 = s2 + Cp_diag * np.log(T3 / T2)
+    s4 = s3 + Cp_diag * np.log(T4 / T3) - R_diag * np.log(P1 / P2)
+
+    # 1-2 Isentropic Compression (vertical)
+    ax2.plot([s1, s1], [T1, T2], '--', color='#3b82f6', linewidth=2.5)
+
+    # 2-3 Heat Addition
+    ax2.plot([s2, s3], [T2, T3], '-', color='#ef4444', linewidth=2.5)
+
+    # 3-4 Isentropic Expansion (vertical)
+    ax2.plot([s3, s3], [T3, T4], '--', color='#3b82f6', linewidth=2.5)
+
+    # 4-1 Heat Rejection
+    ax2.plot([s4, s1], [T4, T1], '-', color='#ef4444', linewidth=2.5)
+
+    ax2.plot([s1, s2, s3, s4],
+             [T1, T2, T3, T4],
+             'o', color='white',
+             markersize=8,
+             markeredgecolor='#ef4444',
+             markeredgewidth=1.5)
+
+    ax2.set_xlabel("Entropy (kJ/kg·K)")
+    ax2.set_ylabel("Temperature (K)")
+    ax2.grid(True)
+    return _fig_png(fig2)
+
 # ==========================================================
 # RUN SIMULATION (triggered by analyze button)
 # ==========================================================
+# Results persist in session state; reruns that leave the inputs untouched
+# (tab switches, downloads) reuse them instead of re-running the model.
+inputs_key = (m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3)
+if analyze or st.session_state.get("inputs_key") != inputs_key:
+    st.session_state["results"] = run_simulation(*inputs_key)
+    st.session_state["inputs_key"] = inputs_key
+results = st.session_state["results"]
+
 if analyze:
-    results = run_simulation(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3)
     st.sidebar.success("✅ Analysis Complete!")
-else:
-    results = run_simulation(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3)
 
 # ==========================================================
 # HEADER
@@ -538,29 +382,29 @@ with dashboard_tab:
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        custom_metric("Steam Cycle Efficiency", f"{results['eta_rankine'] * 100:.2f}", "%")
+        custom_metric("Steam Cycle Efficiency", _fmt2(results.eta_rankine * 100), "%")
     with col2:
-        custom_metric("Brayton Efficiency", f"{results['eta_brayton'] * 100:.2f}", "%")
+        custom_metric("Brayton Efficiency", _fmt2(results.eta_brayton * 100), "%")
     with col3:
-        custom_metric("Overall Efficiency", f"{results['eta_combined'] * 100:.2f}", "%")
+        custom_metric("Overall Efficiency", _fmt2(results.eta_combined * 100), "%")
 
     st.divider()
 
     col4, col5, col6 = st.columns(3)
     with col4:
-        custom_metric("Gas A (Base)", f"{results['gas_A']:.3f}", "kg/hr")
+        custom_metric("Gas A (Base)", _fmt3(results.gas_A), "kg/hr")
     with col5:
-        custom_metric("Gas B (Enhanced)", f"{results['gas_B']:.3f}", "kg/hr")
+        custom_metric("Gas B (Enhanced)", _fmt3(results.gas_B), "kg/hr")
     with col6:
-        custom_metric("⚡ Total Power", f"{results['total_power']:.2f}", "kW")
+        custom_metric("⚡ Total Power", _fmt2(results.total_power), "kW")
 
     col7, col8, col9 = st.columns(3)
     with col7:
-        custom_metric("Brayton Power", f"{results['brayton_power']:.2f}", "kW")
+        custom_metric("Brayton Power", _fmt2(results.brayton_power), "kW")
     with col8:
-        custom_metric("Rankine Power", f"{results['rankine_power']:.2f}", "kW")
+        custom_metric("Rankine Power", _fmt2(results.rankine_power), "kW")
     with col9:
-        custom_metric("Fuel Consumption", f"{results['fuel_consumption_kg_hr']:.3f}", "kg/hr")
+        custom_metric("Fuel Consumption", _fmt3(results.fuel_consumption_kg_hr), "kg/hr")
 
     st.divider()
 
@@ -570,96 +414,13 @@ with dashboard_tab:
     # Rankine h-s Diagram (UNCHANGED)
     with col10:
         st.subheader("h-s Diagram (Steam Cycle)")
-        fig1, ax1 = plt.subplots(figsize=(8, 6))
-        fig1.patch.set_facecolor('#0f172a')
-        ax1.set_facecolor('#0f172a')
-
-        s_liq = np.linspace(0.5, 3.0, 30)
-        h_liq = 200 + 300 * s_liq
-        s_vap = np.linspace(5.5, 8.5, 30)
-        h_vap = 2500 + 200 * (s_vap - 5.5)
-
-        ax1.plot(s_liq, h_liq, '--', color='#4b5563', alpha=0.7, linewidth=1.5)
-        ax1.plot(s_vap, h_vap, '--', color='#4b5563', alpha=0.7, linewidth=1.5)
-
-        pressure_factor = boiler_p / 8.0
-        s1 = 0.8
-        h1 = results['h1']
-        s2 = 0.85
-        h2 = results['h2']
-        s3 = 6.5 + 0.5 * (pressure_factor - 1)
-        h3 = results['h3']
-        s4 = s3 + 0.8 * (1 - eta_turbine)
-        h4 = results['h4']
-
-        points_x = [s1, s2, s3, s4, s1]
-        points_y = [h1, h2, h3, h4, h1]
-
-        ax1.plot(points_x, points_y, 'o-', color='#ef4444', linewidth=2.5, markersize=8,
-                 markerfacecolor='white', markeredgecolor='#ef4444')
-
-        ax1.text(s1 - 0.1, h1 - 30, '1', color='white', fontsize=12, fontweight='bold')
-        ax1.text(s2 + 0.1, h2 - 30, '2', color='white', fontsize=12, fontweight='bold')
-        ax1.text(s3 + 0.1, h3 + 30, '3', color='white', fontsize=12, fontweight='bold')
-        ax1.text(s4 + 0.1, h4 - 30, '4', color='white', fontsize=12, fontweight='bold')
-
-        ax1.set_xlim(0, 9)
-        ax1.set_ylim(0, 3500)
-        ax1.set_xlabel("Entropy (kJ/kg·K)", color='white', fontsize=11)
-        ax1.set_ylabel("Enthalpy (kJ/kg)", color='white', fontsize=11)
-        ax1.tick_params(colors='white', labelsize=10)
-        ax1.grid(True, alpha=0.15, linestyle='--')
-        st.pyplot(fig1)
+        st.image(_rankine_hs_png(boiler_p, eta_turbine, results.h1, results.h2, results.h3, results.h4), width="stretch")
 
     # Brayton T-s Diagram (FIXED ONLY HERE)
     with col11:
         st.subheader("T-s Diagram (Brayton Cycle)")
-        fig2, ax2 = plt.subplots(figsize=(8, 6))
-        fig2.patch.set_facecolor('#0f172a')
-        ax2.set_facecolor('#0f172a')
-
-        Cp_diag = 1.005
-        R_diag = 0.287
-        eps = 1e-9
-
-        T1 = max(results['T1'], eps)
-        T2 = max(results['T2'], eps)
-        T3 = max(results['T3'], eps)
-        T4 = max(results['T4'], eps)
-
-        P1 = max(results['P1'], eps)
-        P2 = max(results['P2'], eps)
-
-        # Correct entropy relations
-        s1 = 0
-        s2 = Cp_diag * np.log(T2 / T1) - R_diag * np.log(P2 / P1)
-        s3 = s2 + Cp_diag * np.log(T3 / T2)
-        s4 = s3 + Cp_diag * np.log(T4 / T3) - R_diag * np.log(P1 / P2)
-
-        # 1-2 Isentropic Compression (vertical)
-        ax2.plot([s1, s1], [T1, T2], '--', color='#3b82f6', linewidth=2.5)
-
-        # 2-3 Heat Addition
-        ax2.plot([s2, s3], [T2, T3], '-', color='#ef4444', linewidth=2.5)
-
-        # 3-4 Isentropic Expansion (vertical)
-        ax2.plot([s3, s3], [T3, T4], '--', color='#3b82f6', linewidth=2.5)
-
-        # 4-1 Heat Rejection
-        ax2.plot([s4, s1], [T4, T1], '-', color='#ef4444', linewidth=2.5)
-
-        ax2.plot([s1, s2, s3, s4],
-                 [T1, T2, T3, T4],
-                 'o', color='white',
-                 markersize=8,
-                 markeredgecolor='#ef4444',
-                 markeredgewidth=1.5)
-
-        ax2.set_xlabel("Entropy (kJ/kg·K)", color='white', fontsize=11)
-        ax2.set_ylabel("Temperature (K)", color='white', fontsize=11)
-        ax2.tick_params(colors='white', labelsize=10)
-        ax2.grid(True, alpha=0.15, linestyle='--')
-        st.pyplot(fig2)
+        st.image(_brayton_ts_png(results.T1, results.T2, results.T3, results.T4,
+                                 results.P1, results.P2), width="stretch")
 
     st.divider()
 
@@ -667,7 +428,7 @@ with dashboard_tab:
     st.subheader("Energy Flow Analysis")
     energy_data = pd.DataFrame({
         'Component': ['Fuel Input (kW)', 'Steam Input (kW)', 'Useful Work (kW)', 'Losses (kW)'],
-        'Energy (kW)': [results['Q_fuel'], results['Q_steam'], results['useful_work'], results['losses']]
+        'Energy (kW)': [results.Q_fuel, results.Q_steam, results.useful_work, results.losses]
     })
     col_chart1, col_chart2 = st.columns(2)
     with col_chart1:
@@ -676,7 +437,7 @@ with dashboard_tab:
         st.subheader("Gas Production Rates")
         gas_data = pd.DataFrame({
             'Gas Type': ['Gas A', 'Gas B', 'Methane'],
-            'Production (kg/hr)': [results['gas_A'], results['gas_B'], results['methane']]
+            'Production (kg/hr)': [results.gas_A, results.gas_B, results.methane]
         })
         st.bar_chart(gas_data.set_index('Gas Type'), height=400)
 
@@ -684,13 +445,13 @@ with dashboard_tab:
     st.subheader("Key Performance Indicators")
     kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
     with kpi_col1:
-        st.metric("Specific Work (Brayton)", f"{results['W_net_brayton']:.2f}", "kJ/s")
+        st.metric("Specific Work (Brayton)", _fmt2(results.W_net_brayton), "kJ/s")
     with kpi_col2:
-        st.metric("Heat Rate (Brayton)", f"{results['Q_in_Brayton']:.2f}", "kJ/s")
+        st.metric("Heat Rate (Brayton)", _fmt2(results.Q_in_Brayton), "kJ/s")
     with kpi_col3:
-        st.metric("Pressure Ratio", f"{rp:.1f}", "")
+        st.metric("Pressure Ratio", _fmt1(rp), "")
     with kpi_col4:
-        st.metric("TIT", f"{results['T3']:.0f}", "K")
+        st.metric("TIT", _fmt0(results.T3), "K")
 
 # ==========================================================
 # REPORT TAB (WITH PDF EXPORT)
@@ -705,113 +466,109 @@ with report_tab:
 
     # Table 1 - Cycle Efficiencies
     st.markdown("<h2 class='report-subheader'>1. Cycle Efficiencies</h2>", unsafe_allow_html=True)
-    df1 = pd.DataFrame({
+    st.dataframe({
         "Parameter": ["Rankine Cycle", "Brayton Cycle", "Combined Cycle"],
         "Efficiency (%)": [
-            f"{results['eta_rankine'] * 100:.2f}",
-            f"{results['eta_brayton'] * 100:.2f}",
-            f"{results['eta_combined'] * 100:.2f}"
+            _fmt2(results.eta_rankine * 100),
+            _fmt2(results.eta_brayton * 100),
+            _fmt2(results.eta_combined * 100)
         ]
-    })
-    st.dataframe(df1, hide_index=True, use_container_width=True)
+    }, hide_index=True, width="stretch")
 
     # Table 2 - State Points
     st.markdown("<h2 class='report-subheader'>2. Brayton Cycle State Points</h2>", unsafe_allow_html=True)
-    df2 = pd.DataFrame({
+    st.dataframe({
         "State": ["Compressor Inlet", "Compressor Outlet", "Turbine Inlet", "Turbine Outlet"],
         "Temperature (K)": [
-            f"{results['T1']:.1f}",
-            f"{results['T2']:.1f}",
-            f"{results['T3']:.1f}",
-            f"{results['T4']:.1f}"
+            _fmt1(results.T1),
+            _fmt1(results.T2),
+            _fmt1(results.T3),
+            _fmt1(results.T4)
         ],
         "Pressure (MPa)": [
-            f"{results['P1']:.3f}",
-            f"{results['P2']:.3f}",
-            f"{results['P2']:.3f}",
-            f"{results['P1']:.3f}"
+            _fmt3(results.P1),
+            _fmt3(results.P2),
+            _fmt3(results.P2),
+            _fmt3(results.P1)
         ]
-    })
-    st.dataframe(df2, hide_index=True, use_container_width=True)
+    }, hide_index=True, width="stretch")
 
     # Table 3 - Energy Summary
     st.markdown("<h2 class='report-subheader'>3. Energy Summary</h2>", unsafe_allow_html=True)
-    df3 = pd.DataFrame({
+    st.dataframe({
         "Parameter": ["Dry biomass (kg/s)", "Moisture (kg/s)", "Fuel Energy (kW)", "Steam Energy (kW)",
                       "Brayton Net Work (kW)", "Rankine Turbine Work (kW)", "Pump Work (kW)", "Total Power (kW)", "Fuel Consumption (kg/hr)"],
         "Value": [
-            f"{results['m_dry']:.3f}",
-            f"{results['m_moisture']:.3f}",
-            f"{results['Q_fuel']:.2f}",
-            f"{results['Q_steam']:.2f}",
-            f"{results['W_net_brayton']:.2f}",
-            f"{results['W_turb_rankine']:.2f}",
-            f"{results['W_pump']:.2f}",
-            f"{results['total_power']:.2f}",
-            f"{results['fuel_consumption_kg_hr']:.3f}"
+            _fmt3(results.m_dry),
+            _fmt3(results.m_moisture),
+            _fmt2(results.Q_fuel),
+            _fmt2(results.Q_steam),
+            _fmt2(results.W_net_brayton),
+            _fmt2(results.W_turb_rankine),
+            _fmt2(results.W_pump),
+            _fmt2(results.total_power),
+            _fmt3(results.fuel_consumption_kg_hr)
         ]
-    })
-    st.dataframe(df3, hide_index=True, use_container_width=True)
+    }, hide_index=True, width="stretch")
 
     # Table 4 - Gas Production
     st.markdown("<h2 class='report-subheader'>4. AD-HTC Gas Production</h2>", unsafe_allow_html=True)
-    df4 = pd.DataFrame({
+    st.dataframe({
         "Parameter": ["Gas A (Base Rate)", "Gas B (Enhanced Rate)", "Methane Production", "HTC Heating Load"],
         "Value": [
-            f"{results['gas_A']:.3f} kg/hr",
-            f"{results['gas_B']:.3f} kg/hr",
-            f"{results['methane']:.3f} kg/hr",
-            f"{results['heating_energy']:,.0f} kJ"
+            _fmtkghr(results.gas_A),
+            _fmtkghr(results.gas_B),
+            _fmtkghr(results.methane),
+            _fmtkj(results.heating_energy)
         ]
-    })
-    st.dataframe(df4, hide_index=True, use_container_width=True)
+    }, hide_index=True, width="stretch")
 
-    # PDF Export
+    # PDF Export - built only on request and kept until the inputs change
     st.markdown("<br>", unsafe_allow_html=True)
-    pdf_buffer = generate_pdf_report(results)
-    st.download_button(
-        label="📥 Download PDF Report",
-        data=pdf_buffer.getvalue(),
-        file_name=f"AD-HTC_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-        mime="application/pdf"
-    )
+    if st.button("📄 Prepare PDF Report"):
+        st.session_state["pdf"] = (inputs_key, generate_pdf_bytes(results))
+
+    pdf = st.session_state.get("pdf")
+    if pdf is not None and pdf[0] == inputs_key:
+        st.download_button(
+            label="📥 Download PDF Report",
+            data=pdf[1],
+            file_name=f"AD-HTC_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            mime="application/pdf"
+        )
 
 # ==========================================================
 # SCHEMATIC TAB (placeholder kept)
 # ==========================================================
 # SCHEMATIC TAB (FULL SCREEN DIAGRAM ONLY)
 # ==========================================================
-with schematic_tab:
-    # Read your HTML file
-
-    with open("schematic.html", "r", encoding="utf-8") as f:
-        html_content = f.read()
-
-    # Extract just the diagram part and create minimal wrapper
-    import re
-
-    # Get the styles
-    style_match = re.search(r'<style>(.*?)</style>', html_content, re.DOTALL)
-    styles = style_match.group(1) if style_match else ""
-
-    # Get the SVG content
-    svg_match = re.search(r'<svg.*?</svg>', html_content, re.DOTALL)
-    svg_content = svg_match.group(0) if svg_match else ""
-
-    # Get the defs (gradients, markers, etc)
-    defs_match = re.search(r'<defs>.*?</defs>', html_content, re.DOTALL)
-    defs_content = defs_match.group(0) if defs_match else ""
-
-    # Create minimal HTML with just the diagram
-    full_html = f"""<!DOCTYPE html>
+# Section of `s` from the first open_tag through the next close_tag (only the
+# text between them when inner=True); empty if either tag is missing. Works on
+# str or bytes. Each tag occurs once in schematic.html, so plain find scans
+# replace regex search.
+def _slice_between(s, open_tag, close_tag, inner=False):
+    i = s.find(open_tag)
+    if i < 0:
+        return s[:0]
+    j = s.find(close_tag, i + len(open_tag))
+    if j < 0:
+        return s[:0]
+    if inner:
+        return s[i + len(open_tag):j]
+    return s[i:j + len(close_tag)]
+
+# Static shell of the diagram page as UTF-8 bytes; the <style> body and <defs>
+# block from schematic.html are spliced in between these three pieces.
+_HTML_PREFIX = b"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;800&display=swap" rel="stylesheet">
     <style>
-        {styles}
-        body {{
+        """
+_HTML_MIDDLE = b"""
+        body {
             margin: 0;
             padding: 0;
             background-color: #0b0f19;
@@ -820,8 +577,8 @@ with schematic_tab:
             align-items: center;
             min-height: 100vh;
             overflow: hidden;
-        }}
-        .diagram-container {{
+        }
+        .diagram-container {
             width: 100%;
             height: 100vh;
             background: rgba(15, 23, 42, 0.6);
@@ -831,22 +588,23 @@ with schematic_tab:
             display: flex;
             justify-content: center;
             align-items: center;
-        }}
-        svg {{
+        }
+        svg {
             width: 100%;
             height: 100%;
             min-height: 700px;
-        }}
+        }
         /* Hide any header elements that might appear */
-        .header, .container > .header, div[class*="header"] {{
+        .header, .container > .header, div[class*="header"] {
             display: none !important;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="diagram-container">
         <svg viewBox="0 70 1000 700" xmlns="http://www.w3.org/2000/svg">
-            {defs_content}
+            """
+_HTML_SUFFIX = b"""
             <!-- FLOW PATHS BASE (Static Background Lines) -->
             <path d="M 30 150 L 115 150" class="flow-path base" />
             <path d="M 220 130 L 710 130 L 710 200 L 690 200" class="flow-path base" />
@@ -983,5 +741,53 @@ with schematic_tab:
 </body>
 </html>"""
 
-    # Display the diagram
-    st.components.v1.html(full_html, height=750, scrolling=False)
\ No newline at end of file
+# The diagram page is rebuilt from schematic.html only when the file changes;
+# the file's mtime is the cache key, so reruns skip the rebuild entirely. The
+# cache stores no value: the assembled page is written under static/ (served
+# by Streamlit at /app/static/), so the browser loads it as a file instead of
+# receiving the whole page over the websocket on every rerun. Streamlit serves
+# the static/ folder next to the main script, so paths are resolved from this
+# file rather than the working directory.
+_APP_DIR = Path(__file__).parent
+_SCHEMATIC_SRC = _APP_DIR / "schematic.html"
+_SCHEMATIC_BUILT = _APP_DIR / "static" / "schematic_built.html"
+
+@st.cache_data(show_spinner=False)
+def _write_schematic_page(mtime):
+    # Read your HTML file in one go; the page is sliced and assembled as raw
+    # bytes, so nothing is decoded or re-encoded
+    html_content = _SCHEMATIC_SRC.read_bytes()
+
+    # Extract just the diagram part and create minimal wrapper
+    # Get the styles
+    styles = _slice_between(html_content, b"<style>", b"</style>", inner=True)
+
+    # Get the defs (gradients, markers, etc)
+    defs_content = _slice_between(html_content, b"<defs>", b"</defs>")
+
+    # Create minimal HTML with just the diagram
+    full_html = _HTML_PREFIX + styles + _HTML_MIDDLE + defs_content + _HTML_SUFFIX
+
+    # Write a private temp file and rename it into place, so sessions building
+    # at the same time never serve a half-written page
+    _SCHEMATIC_BUILT.parent.mkdir(exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=_SCHEMATIC_BUILT.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(full_html)
+        os.replace(tmp_path, _SCHEMATIC_BUILT)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+with schematic_tab:
+    # Display the diagram (the version query busts the browser cache on rebuilds)
+    schematic_mtime = os.path.getmtime(_SCHEMATIC_SRC)
+    # Rebuild if the served copy was deleted while the cache still holds it
+    if not _SCHEMATIC_BUILT.exists():
+        _write_schematic_page.clear()
+    _write_schematic_page(schematic_mtime)
+    # Static files are served under the app's base URL path, if one is set
+    base_path = st.get_option("server.baseUrlPath").strip("/")
+    static_root = f"/{base_path}/app/static" if base_path else "/app/static"
+    st.iframe(f"{static_root}/schematic_built.html?v={int(schematic_mtime)}", height=750)
\ No newline at end of file
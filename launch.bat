@@ -33,20 +33,16 @@ if errorlevel 1 (
     python --version
 )
 
-REM Check/Install Streamlit
+REM Check/Install Streamlit and the other packages in requirements.txt.
+REM pip leaves satisfied packages alone, but upgrades an existing Streamlit
+REM that is older than the version floor the app needs.
 echo.
-echo Checking Streamlit...
-python -c "import streamlit" 2>nul
+echo Checking Streamlit and requirements...
+python -m pip install --quiet -r requirements.txt
 if errorlevel 1 (
-    echo Streamlit not found. Installing...
-    python -m pip install --quiet streamlit
-    if errorlevel 1 (
-        echo ERROR: Failed to install Streamlit.
-        pause
-        exit /b 1
-    ) else (
-        echo Streamlit installed successfully.
-    )
+    echo ERROR: Failed to install requirements.
+    pause
+    exit /b 1
 ) else (
     echo Streamlit is ready.
 )
@@ -0,0 +1,347 @@
+# ==============================================================================
+# PROJECT: AD-HTC NEXUS INTEGRATED POWER PLANT
+# ------------------------------------------------------------------------------
+# Thermodynamic model of the integrated AD-HTC / Brayton / Rankine plant.
+# Plain NumPy with no Streamlit side effects, so it can be imported by app.py,
+# by batch scripts and by worker processes alike. The optional numba kernel
+# lives in simulation_jit.py and is loaded on first use.
+# ==============================================================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import NamedTuple
+
+import numpy as np
+
+# ==========================================================
+# SATURATED WATER PROPERTIES (condenser side)
+# ==========================================================
+# Saturated-liquid enthalpy and specific volume vs pressure (IAPWS-IF97 steam
+# tables), spanning the condenser pressure input range 0.001 - 1.0 MPa.
+# Interpolated with np.interp, so lookups are branch-free and vectorize.
+P_SAT = np.array([
+    0.001, 0.0015, 0.002, 0.0025, 0.003, 0.004, 0.005, 0.0075, 0.010, 0.015,
+    0.020, 0.025, 0.030, 0.040, 0.050, 0.075, 0.100, 0.125, 0.150, 0.200,
+    0.250, 0.300, 0.400, 0.500, 0.600, 0.700, 0.800, 0.900, 1.000,
+])  # MPa
+HF_SAT = np.array([
+    29.30, 54.69, 73.43, 88.42, 100.98, 121.39, 137.75, 168.75, 191.81, 225.94,
+    251.42, 271.96, 289.27, 317.62, 340.54, 384.44, 417.51, 444.36, 467.13, 504.70,
+    535.35, 561.43, 604.66, 640.09, 670.38, 697.00, 720.87, 742.56, 762.51,
+])  # kJ/kg
+VF_SAT = np.array([
+    0.001000, 0.001001, 0.001001, 0.001002, 0.001003, 0.001004, 0.001005, 0.001008, 0.001010, 0.001014,
+    0.001017, 0.001020, 0.001022, 0.001026, 0.001030, 0.001037, 0.001043, 0.001048, 0.001053, 0.001061,
+    0.001067, 0.001073, 0.001084, 0.001093, 0.001101, 0.001108, 0.001115, 0.001121, 0.001127,
+])  # m3/kg
+
+# ==========================================================
+# SIMULATION FUNCTION (computes all expected outputs)
+# ==========================================================
+# Isentropic exponent for air, (gamma - 1) / gamma
+_GAMMA = 1.4
+_K_GAMMA = (_GAMMA - 1) / _GAMMA
+
+# Inputs echoed back for the report
+class Inputs(NamedTuple):
+    m_biomass: float
+    MC: float
+    LHV_MJkg: float
+    boiler_p: float
+    boiler_T: float
+    cond_p: float
+    rp: float
+    eta_comp: float
+    eta_turbine: float
+    T3: float
+
+# Results of a single (scalar) simulation run, read by the dashboard,
+# report tab and PDF export
+@dataclass(frozen=True, slots=True)
+class SimResults:
+    # 1-2 Mass flows
+    m_dry: float
+    m_moisture: float
+    # 3-6 Energy & heat transfers
+    Q_in_Brayton: float
+    Q_in_Rankine: float
+    Q_fuel: float
+    Q_steam: float
+    # 7-10 Work terms
+    W_comp: float
+    W_turb_brayton: float
+    W_turb_rankine: float
+    W_pump: float
+    W_net_rankine: float
+    # 11 Net work
+    W_net_brayton: float
+    # 12-14 Efficiencies
+    eta_brayton: float
+    eta_rankine: float
+    eta_combined: float
+    # 15-17 Power outputs
+    brayton_power: float
+    rankine_power: float
+    total_power: float
+    # 18 Fuel consumption
+    fuel_consumption_kg_hr: float
+    # 19 Energy flow summary
+    useful_work: float
+    losses: float
+    # 20-23 Gas production & HTC
+    gas_A: float
+    gas_B: float
+    methane: float
+    heating_energy: float
+    # 24-25 State points and enthalpies for charts
+    T1: float
+    T2: float
+    T3: float
+    T4: float
+    P1: float
+    P2: float
+    h1: float
+    h2: float
+    h3: float
+    h4: float
+    # Echo inputs for report
+    inputs: Inputs
+
+# Output columns of the model (SimResults order, minus the echoed inputs) and
+# the structured dtype both model entry points fill: one contiguous float64
+# record per evaluated point.
+_RESULT_FIELDS = tuple(f.name for f in fields(SimResults) if f.name != "inputs")
+RESULT_DTYPE = np.dtype([(name, np.float64) for name in _RESULT_FIELDS])
+
+def _safe_div(num, den):
+    # Element-wise num / den, 0.0 wherever den <= 0 (mirrors the scalar guards)
+    return np.divide(num, den, out=np.zeros(np.shape(num)), where=den > 0)
+
+# Vectorized model: every input may be a scalar or an ndarray; inputs are
+# broadcast against each other and the result is a RESULT_DTYPE array of
+# that shape (read a column with out["eta_combined"]).
+# Used directly for parameter sweeps / sensitivity studies.
+def run_simulation_vec(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3):
+    m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3 = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64)
+          for x in (m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3))
+    )
+    shape = m_biomass.shape
+
+    # ---------- 1-2 Mass splits (Inputs 1 & 2)
+    m_dry = m_biomass * (1 - MC)  # kg/s
+    m_moisture = m_biomass * MC  # kg/s
+
+    # ---------- 3-6 Energy inputs (Input 3 LHV)
+    # Convert LHV to kJ/kg
+    LHV_kJ = LHV * 1000.0  # kJ/kg
+    # Fuel energy input (Brayton) from dry biomass
+    Q_in_Brayton = m_dry * LHV_kJ  # kJ/s (kW)
+    # Rankine heat input from moisture (uses enthalpy difference below)
+    # Boiler enthalpy approximations (h3) will be computed later; placeholder for now
+    # Q_in_Rankine computed after h3,h2 are known
+
+    # ---------- Brayton cycle (Inputs 7,8,9,10)
+    Cp = 1.005  # kJ/kg.K (approx for air)
+    R = 0.287  # kJ/kg.K
+    T1 = np.full(shape, 298.15)  # K ambient
+    P1 = np.full(shape, 0.1013)  # MPa ambient
+    P2 = P1 * rp
+    rp_k = rp ** _K_GAMMA  # isentropic temperature ratio, shared by compressor and turbine
+
+    # Isentropic compressor outlet temperature
+    T2s = T1 * rp_k
+    # Actual compressor outlet temperature using compressor efficiency
+    T2 = T1 + (T2s - T1) / eta_comp
+    # Compressor work per kg of working fluid (kJ/kg)
+    W_comp_per_kg = Cp * (T2 - T1)
+
+    # Choose a working fluid mass flow (kg/s) linked to fuel via an assumed AFR
+    AFR = 20.0  # air-to-fuel mass ratio (assumption)
+    working_flow = np.maximum(1.0, AFR * m_dry)  # kg/s of working fluid
+
+    # Total compressor work (kJ/s)
+    W_comp = W_comp_per_kg * working_flow
+
+    # Heat added per kg working fluid (kJ/kg) and total Qin for Brayton (kJ/s)
+    Qin_per_kg = Cp * (T3 - T2)
+    Qin_total = Qin_per_kg * working_flow
+
+    # Turbine expansion (isentropic then actual)
+    T4s = T3 / rp_k
+    T4 = T3 - eta_turbine * (T3 - T4s)
+    W_turbine_per_kg = Cp * (T3 - T4)
+    W_turbine_brayton = W_turbine_per_kg * working_flow
+
+    # Net Brayton work (kJ/s)
+    W_net_brayton = W_turbine_brayton - W_comp
+
+    # Brayton efficiency (use total Qin_total)
+    eta_brayton = _safe_div(W_net_brayton, Qin_total)
+
+    # ---------- Rankine cycle (Inputs 4,5,6)
+    # Pump work per kg (kJ/kg) - incompressible approximation
+    v_f = np.interp(cond_p, P_SAT, VF_SAT)  # m3/kg, saturated liquid at condenser pressure
+    W_pump_per_kg = v_f * (boiler_p - cond_p) * 1000.0  # kJ/kg (MPa->kPa)
+    # Saturated liquid enthalpy at condenser pressure
+    h1 = np.interp(cond_p, P_SAT, HF_SAT)
+    h2 = h1 + W_pump_per_kg
+
+    # Boiler outlet enthalpy (approx from boiler temperature)
+    h3 = 2800.0 + 2.0 * (boiler_T - 500.0)  # kJ/kg (approx)
+    # Isentropic enthalpy drop (approx) and actual turbine work per kg
+    delta_h_isentropic = 1200.0 * (1.0 - 0.03 * (boiler_p - 8.0))
+    W_turbine_rankine_per_kg_isentropic = delta_h_isentropic
+    W_turbine_rankine_per_kg_actual = W_turbine_rankine_per_kg_isentropic * eta_turbine
+    h4 = h3 - W_turbine_rankine_per_kg_actual
+
+    # Ensure physical bounds
+    h4 = np.where(h4 < h1, h1 + 50.0, h4)
+
+    # Heat recovery from Brayton exhaust
+    HRSG_eff = 0.85  # Heat recovery steam generator efficiency
+    Q_exhaust = working_flow * Cp * (T4 - T1)  # Waste heat available in exhaust
+    Q_in_Rankine = HRSG_eff * Q_exhaust  # Heat transferred to Rankine cycle
+
+    # Steam mass flow determined by available heat
+    m_steam = _safe_div(Q_in_Rankine, h3 - h2)
+
+    W_turbine_rankine = m_steam * (h3 - h4)  # kJ/s
+    W_pump = W_pump_per_kg * m_steam  # kJ/s
+    W_net_rankine = W_turbine_rankine - W_pump
+
+    # Rankine efficiency (based on heat input to Rankine)
+    eta_rankine = _safe_div(W_net_rankine, Q_in_Rankine)
+
+    # ---------- Combined cycle - CORRECTED!
+    # Only the fuel input is the original energy source
+    total_fuel_input = Q_in_Brayton  # Only fuel energy, NOT adding recovered heat
+    total_output_work = np.maximum(0.0, W_net_brayton) + np.maximum(0.0, W_net_rankine)
+
+    # CORRECT: Divide total work by ONLY the fuel input
+    eta_combined = _safe_div(total_output_work, total_fuel_input)
+
+    # ---------- Energy flow analysis (Sankey data)
+    Q_fuel = Q_in_Brayton  # kJ/s ~ kW
+    Q_steam = Q_in_Rankine
+    useful_work = total_output_work
+    losses = Q_fuel - useful_work  # Losses are fuel minus useful work
+
+    # ---------- Gas production (AD-HTC empirical approximations)
+    rp_over_8 = rp / 8.0
+    T3_over_1200 = T3 / 1200.0
+    gas_A = 0.568 * rp_over_8 ** 0.7 * T3_over_1200 ** 0.5  # kg/hr
+    gas_B = 1.716 * rp_over_8 ** 0.8 * T3_over_1200 ** 0.6  # kg/hr
+    methane = 1.029 * T3_over_1200 ** 0.9 * (eta_combined / 0.5) ** 0.3  # kg/hr
+    heating_energy = 928106.3 * (eta_combined / 0.6) * (gas_B / 1.5)  # kJ (approx)
+
+    # ---------- Derived power outputs (kW)
+    brayton_power = np.maximum(0.0, W_net_brayton)  # kJ/s -> kW
+    rankine_power = np.maximum(0.0, W_net_rankine)  # kJ/s -> kW
+    total_power = brayton_power + rankine_power
+
+    # ---------- Fuel consumption (kg/hr) using LHV_kJ
+    # Use Q_in_Brayton (kJ/s) divided by LHV_kJ (kJ/kg) to get kg/s
+    m_fuel_kg_s = _safe_div(Q_in_Brayton, LHV_kJ)
+    fuel_consumption_kg_hr = m_fuel_kg_s * 3600.0
+
+    # ---------- Package results into one structured buffer (RESULT_DTYPE)
+    out = np.empty(shape, dtype=RESULT_DTYPE)
+    # 1-2 Mass flows
+    out["m_dry"] = m_dry
+    out["m_moisture"] = m_moisture
+    # 3-6 Energy & heat transfers
+    out["Q_in_Brayton"] = Q_in_Brayton
+    out["Q_in_Rankine"] = Q_in_Rankine
+    out["Q_fuel"] = Q_fuel
+    out["Q_steam"] = Q_steam
+    # 7-10 Work terms
+    out["W_comp"] = W_comp
+    out["W_turb_brayton"] = W_turbine_brayton
+    out["W_turb_rankine"] = W_turbine_rankine
+    out["W_pump"] = W_pump
+    out["W_net_rankine"] = W_net_rankine
+    # 11 Net work
+    out["W_net_brayton"] = W_net_brayton
+    # 12-14 Efficiencies
+    out["eta_brayton"] = eta_brayton
+    out["eta_rankine"] = eta_rankine
+    out["eta_combined"] = eta_combined
+    # 15-17 Power outputs
+    out["brayton_power"] = brayton_power
+    out["rankine_power"] = rankine_power
+    out["total_power"] = total_power
+    # 18 Fuel consumption
+    out["fuel_consumption_kg_hr"] = fuel_consumption_kg_hr
+    # 19 Energy flow summary
+    out["useful_work"] = useful_work
+    out["losses"] = losses
+    # 20-23 Gas production & HTC
+    out["gas_A"] = gas_A
+    out["gas_B"] = gas_B
+    out["methane"] = methane
+    out["heating_energy"] = heating_energy
+    # 24-25 State points and enthalpies for charts
+    out["T1"], out["T2"], out["T3"], out["T4"] = T1, T2, T3, T4
+    out["P1"], out["P2"] = P1, P2
+    out["h1"], out["h2"], out["h3"], out["h4"] = h1, h2, h3, h4
+
+    return out
+
+# Batch entry point for Monte Carlo / Sobol sweeps: same inputs and result
+# layout as run_simulation_vec, evaluated by the parallel JIT kernel. numba is
+# optional and only imported on the first call (the dashboard never needs it);
+# without it this falls back to the NumPy implementation.
+def run_simulation_jit(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3):
+    try:
+        from simulation_jit import simulation_kernel
+    except ImportError:
+        return run_simulation_vec(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3)
+
+    inputs = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64)
+          for x in (m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3))
+    )
+    shape = inputs[0].shape
+    columns = [np.ascontiguousarray(x).ravel() for x in inputs]
+    out = np.empty(columns[0].size, dtype=RESULT_DTYPE)
+    # The kernel fills the records through a plain (N, fields) float64 view
+    simulation_kernel(*columns, out.view(np.float64).reshape(out.size, len(_RESULT_FIELDS)))
+    return out.reshape(shape)
+
+# Scalar entry point used by the UI: evaluates the vectorized model on 0-d
+# arrays and unpacks the single result record into plain floats. Not cached:
+# one evaluation costs a few microseconds, less than a cache lookup, and
+# unchanged reruns already reuse the results kept in session state.
+def run_simulation(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3):
+    row = run_simulation_vec(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3)
+    return SimResults(
+        *row.item(),
+        inputs=Inputs(*map(float, (m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3))),
+    )
+
+# Rows per worker below which a process pool costs more than it saves; the
+# vectorized model evaluates well over a million rows per second.
+_BATCH_ROWS_PER_WORKER = 200_000
+
+# Worker for run_batch: one contiguous chunk of every input column
+def _run_chunk(columns):
+    return run_simulation_vec(**columns)
+
+# Runs one independent case per row of `param_df` (columns named after the
+# run_simulation arguments) and returns a RESULT_DTYPE array in row order.
+# Rows are split into one contiguous chunk per worker process, each evaluated
+# by run_simulation_vec; small batches run in-process. With the spawn start
+# method (Windows) call this from under `if __name__ == "__main__":`.
+def run_batch(param_df, n_workers=None):
+    columns = {name: param_df[name].to_numpy(dtype=np.float64) for name in param_df.columns}
+    n_rows = len(param_df)
+    n_workers = min(n_workers or os.cpu_count() or 1, -(-n_rows // _BATCH_ROWS_PER_WORKER))
+    if n_workers <= 1:
+        return run_simulation_vec(**columns)
+
+    bounds = np.linspace(0, n_rows, n_workers + 1).astype(int)
+    chunks = [{name: col[a:b] for name, col in columns.items()} for a, b in zip(bounds[:-1], bounds[1:])]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return np.concatenate(list(executor.map(_run_chunk, chunks)))
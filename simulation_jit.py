@@ -0,0 +1,96 @@
+# ==============================================================================
+# PROJECT: AD-HTC NEXUS INTEGRATED POWER PLANT
+# ------------------------------------------------------------------------------
+# numba kernel behind simulation.run_simulation_jit. Imported lazily by that
+# function, so numba is only loaded (and the kernel compiled) when a JIT batch
+# is actually requested. Importing this module requires numba.
+# ==============================================================================
+
+import numpy as np
+from numba import njit, prange
+
+from simulation import HF_SAT, P_SAT, VF_SAT, _K_GAMMA
+
+# Single-point model for the JIT kernel; restates run_simulation_vec's formulas
+# (tests/test_simulation_jit.py checks the two stay in agreement).
+@njit(cache=True, fastmath=True)
+def _simulate_point(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3):
+    Cp = 1.005  # kJ/kg.K
+    T1 = 298.15  # K ambient
+    P1 = 0.1013  # MPa ambient
+    AFR = 20.0
+    HRSG_eff = 0.85
+
+    # Mass splits and fuel energy
+    m_dry = m_biomass * (1 - MC)
+    m_moisture = m_biomass * MC
+    LHV_kJ = LHV * 1000.0
+    Q_in_Brayton = m_dry * LHV_kJ
+
+    # Brayton cycle
+    P2 = P1 * rp
+    rp_k = rp ** _K_GAMMA
+    T2s = T1 * rp_k
+    T2 = T1 + (T2s - T1) / eta_comp
+    working_flow = max(1.0, AFR * m_dry)
+    W_comp = Cp * (T2 - T1) * working_flow
+    Qin_total = Cp * (T3 - T2) * working_flow
+    T4s = T3 / rp_k
+    T4 = T3 - eta_turbine * (T3 - T4s)
+    W_turbine_brayton = Cp * (T3 - T4) * working_flow
+    W_net_brayton = W_turbine_brayton - W_comp
+    eta_brayton = W_net_brayton / Qin_total if Qin_total > 0 else 0.0
+
+    # Rankine cycle
+    v_f = np.interp(cond_p, P_SAT, VF_SAT)
+    W_pump_per_kg = v_f * (boiler_p - cond_p) * 1000.0
+    h1 = np.interp(cond_p, P_SAT, HF_SAT)
+    h2 = h1 + W_pump_per_kg
+    h3 = 2800.0 + 2.0 * (boiler_T - 500.0)
+    h4 = h3 - 1200.0 * (1.0 - 0.03 * (boiler_p - 8.0)) * eta_turbine
+    if h4 < h1:
+        h4 = h1 + 50.0
+    Q_in_Rankine = HRSG_eff * working_flow * Cp * (T4 - T1)
+    m_steam = Q_in_Rankine / (h3 - h2) if (h3 - h2) > 0 else 0.0
+    W_turbine_rankine = m_steam * (h3 - h4)
+    W_pump = W_pump_per_kg * m_steam
+    W_net_rankine = W_turbine_rankine - W_pump
+    eta_rankine = W_net_rankine / Q_in_Rankine if Q_in_Rankine > 0 else 0.0
+
+    # Combined cycle
+    brayton_power = max(0.0, W_net_brayton)
+    rankine_power = max(0.0, W_net_rankine)
+    total_power = brayton_power + rankine_power
+    eta_combined = total_power / Q_in_Brayton if Q_in_Brayton > 0 else 0.0
+
+    # Gas production
+    rp_over_8 = rp / 8.0
+    T3_over_1200 = T3 / 1200.0
+    gas_A = 0.568 * rp_over_8 ** 0.7 * T3_over_1200 ** 0.5
+    gas_B = 1.716 * rp_over_8 ** 0.8 * T3_over_1200 ** 0.6
+    methane = 1.029 * T3_over_1200 ** 0.9 * (eta_combined / 0.5) ** 0.3
+    heating_energy = 928106.3 * (eta_combined / 0.6) * (gas_B / 1.5)
+
+    # Fuel consumption
+    m_fuel_kg_s = Q_in_Brayton / LHV_kJ if LHV_kJ > 0 else 0.0
+
+    return (m_dry, m_moisture,
+            Q_in_Brayton, Q_in_Rankine, Q_in_Brayton, Q_in_Rankine,
+            W_comp, W_turbine_brayton, W_turbine_rankine, W_pump, W_net_rankine,
+            W_net_brayton,
+            eta_brayton, eta_rankine, eta_combined,
+            brayton_power, rankine_power, total_power,
+            m_fuel_kg_s * 3600.0,
+            total_power, Q_in_Brayton - total_power,
+            gas_A, gas_B, methane, heating_energy,
+            T1, T2, T3, T4,
+            P1, P2,
+            h1, h2, h3, h4)
+
+@njit(parallel=True, fastmath=True, cache=True)
+def simulation_kernel(m_biomass, MC, LHV, boiler_p, boiler_T, cond_p, rp, eta_comp, eta_turbine, T3, out):
+    for i in prange(out.shape[0]):
+        row = _simulate_point(m_biomass[i], MC[i], LHV[i], boiler_p[i], boiler_T[i], cond_p[i],
+                              rp[i], eta_comp[i], eta_turbine[i], T3[i])
+        for j in range(out.shape[1]):
+            out[i, j] = row[j]
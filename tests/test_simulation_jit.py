@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+import simulation
+import simulation_jit
+
+
+# A fixed random spread over the UI input ranges plus the edges (dry and
+# all-moisture feed, both ends of the steam table)
+def _probe_inputs(n=256):
+    rng = np.random.default_rng(0)
+    lo = np.array([0.01, 0.0, 5.0, 0.1, 200.0, 0.001, 2.0, 0.5, 0.5, 800.0])
+    hi = np.array([1000.0, 1.0, 30.0, 30.0, 700.0, 1.0, 20.0, 1.0, 1.0, 2000.0])
+    probe = lo + (hi - lo) * rng.random((n, lo.size))
+    probe[:4, 1] = (0.0, 1.0, 0.0, 1.0)
+    probe[:4, 5] = (0.001, 0.001, 1.0, 1.0)
+    return [np.ascontiguousarray(col) for col in probe.T]
+
+
+# _simulate_point and run_simulation_vec are two hand-written copies of the model
+@pytest.mark.parametrize("name", simulation._RESULT_FIELDS)
+def test_kernel_matches_vectorized_model(name):
+    columns = _probe_inputs()
+    out = np.empty((columns[0].size, len(simulation._RESULT_FIELDS)))
+    simulation_jit.simulation_kernel(*columns, out)
+    ref = simulation.run_simulation_vec(*columns)
+    j = simulation._RESULT_FIELDS.index(name)
+    np.testing.assert_allclose(out[:, j], ref[name], rtol=1e-9, atol=1e-9)
+
+
+def test_run_simulation_jit_matches_vectorized_model():
+    columns = _probe_inputs()
+    out = simulation.run_simulation_jit(*columns)
+    ref = simulation.run_simulation_vec(*columns)
+    assert out.dtype == simulation.RESULT_DTYPE
+    for name in simulation._RESULT_FIELDS:
+        np.testing.assert_allclose(out[name], ref[name], rtol=1e-9, atol=1e-9)